@@ -0,0 +1,233 @@
+"""
+Offline bulk inference over image directories and video files.
+
+Runs the same pipeline as the /api/predict endpoint (MediaPipe hand crop,
+ResNet50 preprocessing, CNN prediction) without going through HTTP.
+Decoding and MediaPipe run in a process pool, crops are batched through
+the model, and results are streamed to a JSONL or CSV file.
+
+Examples:
+    python bulk_predict.py data/indian-sign-language-dataset/Indian -o results.jsonl
+    python bulk_predict.py live_errors/ clip.mp4 -o results.csv --workers 8
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing as mp_proc
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from hand_crop import crop_hand, CLASS_NAMES
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+# Videos are split into tasks of this many frames so long recordings use the whole pool
+FRAMES_PER_TASK = 128
+
+CSV_FIELDS = ['source', 'frame', 'label', 'gesture', 'confidence', 'hand_detected', 'message', 'hand_bbox']
+
+# Per-worker MediaPipe detector, created by init_worker
+_hands = None
+_input_size = (64, 64)
+
+def init_worker(input_size):
+    global _hands, _input_size
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=2,
+        min_detection_confidence=0.5
+    )
+    _input_size = tuple(input_size)
+
+def process_task(task):
+    """Decode one image, or a [start, end) frame range of a video, and return a record per frame"""
+    path, label, frame_stride, start, end = task
+    records = []
+    try:
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            cap = cv2.VideoCapture(path)
+            if start:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            frame_idx = start
+            while end is None or frame_idx < end:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if frame_idx % frame_stride == 0:
+                    record = crop_hand(frame, _hands, _input_size)
+                    record.update({'source': path, 'frame': frame_idx, 'label': label})
+                    records.append(record)
+                frame_idx += 1
+            cap.release()
+        else:
+            frame = cv2.imread(path)
+            if frame is None:
+                raise ValueError("could not decode image")
+            record = crop_hand(frame, _hands, _input_size)
+            record.update({'source': path, 'frame': 0, 'label': label})
+            records.append(record)
+    except Exception as e:
+        records.append({
+            'source': path, 'frame': start, 'label': label,
+            'hand_detected': False, 'message': f'Error: {str(e)}',
+            'hand_bbox': None, 'crop': None
+        })
+    return records
+
+def file_tasks(path, label, frame_stride):
+    """(path, label, frame_stride, start, end) tasks for one file; videos are split into frame ranges"""
+    if not path.lower().endswith(VIDEO_EXTENSIONS):
+        return [(path, label, frame_stride, 0, None)]
+
+    cap = cv2.VideoCapture(path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if frame_count <= 0:
+        # Frame count unknown (some containers/streams): decode the whole file in one task
+        return [(path, label, frame_stride, 0, None)]
+
+    tasks = []
+    for start in range(0, frame_count, FRAMES_PER_TASK):
+        end = start + FRAMES_PER_TASK
+        # The last range is open-ended in case the reported frame count is short
+        tasks.append((path, label, frame_stride, start, end if end < frame_count else None))
+    return tasks
+
+def collect_tasks(inputs, frame_stride):
+    """Expand input paths into (path, label, frame_stride, start, end) tasks"""
+    tasks = []
+    file_count = 0
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            for root, _, files in os.walk(input_path):
+                # Directory names such as Indian/A double as ground-truth labels
+                label = os.path.basename(root)
+                if label not in CLASS_NAMES:
+                    label = None
+                for filename in sorted(files):
+                    if filename.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS):
+                        tasks += file_tasks(os.path.join(root, filename), label, frame_stride)
+                        file_count += 1
+        elif os.path.isfile(input_path):
+            label = os.path.basename(os.path.dirname(os.path.abspath(input_path)))
+            tasks += file_tasks(input_path, label if label in CLASS_NAMES else None, frame_stride)
+            file_count += 1
+        else:
+            print(f"Skipping missing input: {input_path}")
+    return tasks, file_count
+
+class ResultWriter:
+    """Stream result records to a JSONL or CSV file (chosen by extension)"""
+
+    def __init__(self, filepath):
+        self.file = open(filepath, 'w', newline='')
+        self.is_csv = filepath.lower().endswith('.csv')
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        row = {field: record.get(field) for field in CSV_FIELDS}
+        if self.is_csv:
+            row['hand_bbox'] = ' '.join(str(v) for v in row['hand_bbox']) if row['hand_bbox'] else ''
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + '\n')
+
+    def close(self):
+        self.file.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ISL gesture prediction over image directories and video files")
+    parser.add_argument('inputs', nargs='+', help="Image directories, image files or video files")
+    parser.add_argument('-o', '--output', default='bulk_results.jsonl', help="Output file (.jsonl or .csv)")
+    parser.add_argument('--model', default='./isl_cnn_model.keras/', help="Path to the trained model")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Decode/MediaPipe worker processes")
+    parser.add_argument('--batch-size', type=int, default=64, help="Crops per model.predict call")
+    parser.add_argument('--frame-stride', type=int, default=1, help="Use every Nth frame of video files")
+    parser.add_argument('--input-size', type=int, default=64, help="Model input width/height")
+    args = parser.parse_args()
+
+    tasks, file_count = collect_tasks(args.inputs, max(1, args.frame_stride))
+    if not tasks:
+        print("No images or videos found.")
+        sys.exit(1)
+    print(f"Found {file_count} files ({len(tasks)} tasks).")
+
+    input_size = (args.input_size, args.input_size)
+
+    # Start workers before importing TensorFlow so they don't inherit its state
+    pool = mp_proc.Pool(args.workers, initializer=init_worker, initargs=(input_size,))
+
+    from tensorflow.keras.applications.resnet50 import preprocess_input
+    from tensorflow.keras.models import load_model
+    model = load_model(args.model)
+
+    writer = ResultWriter(args.output)
+    pending = []
+    total_frames = 0
+    predicted_frames = 0
+    labelled = 0
+    correct = 0
+    next_report = 1000
+    start_time = time.time()
+
+    def flush():
+        nonlocal predicted_frames, labelled, correct
+        if not pending:
+            return
+        batch = np.stack([record.pop('crop') for record in pending])
+        preds = model.predict(preprocess_input(batch), batch_size=args.batch_size, verbose=0)
+        for record, pred in zip(pending, preds):
+            record['gesture'] = CLASS_NAMES[int(np.argmax(pred))]
+            record['confidence'] = float(np.max(pred))
+            if record['label'] is not None:
+                labelled += 1
+                correct += int(record['gesture'] == record['label'])
+            writer.write(record)
+        predicted_frames += len(pending)
+        pending.clear()
+
+    try:
+        for records in pool.imap(process_task, tasks, chunksize=8):
+            for record in records:
+                total_frames += 1
+                if record['crop'] is None:
+                    record['gesture'] = None
+                    record['confidence'] = 0.0
+                    if record['label'] is not None:
+                        labelled += 1
+                    writer.write(record)
+                else:
+                    pending.append(record)
+                    if len(pending) >= args.batch_size:
+                        flush()
+            if total_frames >= next_report:
+                elapsed = time.time() - start_time
+                print(f"{total_frames} frames, {total_frames / elapsed:.1f} frames/s")
+                while next_report <= total_frames:
+                    next_report += 1000
+        flush()
+    finally:
+        pool.close()
+        pool.join()
+        writer.close()
+
+    elapsed = time.time() - start_time
+    print(f"\nProcessed {total_frames} frames from {file_count} files in {elapsed:.2f}s")
+    print(f"Throughput: {total_frames / elapsed:.1f} frames/s")
+    print(f"Frames with a hand crop: {predicted_frames}")
+    if labelled:
+        # Frames without a usable hand crop count as misses
+        print(f"Accuracy on {labelled} labelled frames: {correct / labelled:.4f}")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
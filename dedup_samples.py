@@ -0,0 +1,256 @@
+"""
+Near-duplicate removal and labeling queue for the dataset and live_errors.
+
+Computes backbone embeddings for every image in the dataset tree and the
+live_errors pool, caches them in an on-disk index (only new or modified
+files are re-embedded), and clusters images whose embeddings are within a
+cosine distance of each other.
+
+- Live errors that duplicate an existing dataset image are dropped
+  (moved to duplicates/live_errors/).
+- With --dedup-dataset, duplicate images inside the dataset tree are dropped
+  as well (moved to duplicates/<class>/). Only images in the same class
+  directory as the cluster's leader count as duplicates.
+
+Dropped files are always moved, never deleted.
+- The remaining live-error clusters are ranked by model uncertainty and
+  written to a labeling queue used by label_live_errors.py, which shows one
+  representative per cluster.
+
+Without --apply nothing is moved or deleted; only the index and the
+labeling queue are written.
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+from hand_crop import CLASS_NAMES
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+live_errors_dir = os.path.join(base_dir, "live_errors")
+dataset_dir = os.path.join(base_dir, "data", "indian-sign-language-dataset", "Indian")
+duplicates_dir = os.path.join(base_dir, "duplicates")
+DEFAULT_INDEX_PATH = os.path.join(base_dir, "embedding_index.npz")
+DEFAULT_QUEUE_PATH = os.path.join(live_errors_dir, "label_queue.json")
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+def list_images():
+    """Return (path, source) pairs; dataset images first so they lead their clusters"""
+    images = []
+    if os.path.isdir(dataset_dir):
+        for root, _, files in os.walk(dataset_dir):
+            for filename in sorted(files):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append((os.path.join(root, filename), 'dataset'))
+    if os.path.isdir(live_errors_dir):
+        for filename in sorted(os.listdir(live_errors_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                images.append((os.path.join(live_errors_dir, filename), 'live'))
+    return images
+
+def build_embedding_model(model):
+    """Model returning (pooled backbone embedding, class probabilities)"""
+    from tensorflow.keras.layers import GlobalAveragePooling2D
+    from tensorflow.keras.models import Model
+
+    pool_layer = next(layer for layer in model.layers if isinstance(layer, GlobalAveragePooling2D))
+    return Model(inputs=model.inputs, outputs=[pool_layer.output, model.output])
+
+def embed_images(embedding_model, paths, input_size=(64, 64), batch_size=256):
+    from tensorflow.keras.applications.resnet50 import preprocess_input
+
+    embeddings = []
+    probs = []
+    for start in range(0, len(paths), batch_size):
+        batch = []
+        for path in paths[start:start + batch_size]:
+            img = cv2.imread(path)
+            if img is None:
+                img = np.zeros(input_size + (3,), dtype=np.uint8)
+            img = cv2.resize(img, input_size)
+            batch.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        emb, prob = embedding_model.predict(preprocess_input(np.stack(batch)), verbose=0)
+        embeddings.append(emb)
+        probs.append(prob)
+        print(f"Embedded {min(start + batch_size, len(paths))}/{len(paths)} images")
+
+    embeddings = np.concatenate(embeddings).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+    return embeddings, np.concatenate(probs).astype(np.float32)
+
+def update_index(index_path, model_path):
+    """
+    Load the on-disk index and embed only images that are new or modified
+
+    Returns:
+        dict: paths, sources, embeddings (L2-normalised) and probs for current images
+    """
+    images = list_images()
+    paths = [path for path, _ in images]
+    mtimes = np.array([os.path.getmtime(path) for path in paths], dtype=np.float64)
+
+    # Cached embeddings are only valid for the exact model that produced them
+    model_mtime = os.path.getmtime(model_path)
+    cached = {}
+    if os.path.exists(index_path):
+        index = np.load(index_path, allow_pickle=False)
+        if str(index['model_path']) == model_path and float(index['model_mtime']) == model_mtime:
+            for i, path in enumerate(index['paths']):
+                cached[str(path)] = (float(index['mtimes'][i]), index['embeddings'][i], index['probs'][i])
+
+    missing = [i for i, path in enumerate(paths)
+               if path not in cached or cached[path][0] != mtimes[i]]
+    print(f"{len(paths)} images, {len(paths) - len(missing)} cached, {len(missing)} to embed")
+
+    embeddings = None
+    probs = None
+    if missing:
+        from tensorflow.keras.models import load_model
+        embedding_model = build_embedding_model(load_model(model_path))
+        new_embeddings, new_probs = embed_images(embedding_model, [paths[i] for i in missing])
+        embeddings = np.zeros((len(paths), new_embeddings.shape[1]), dtype=np.float32)
+        probs = np.zeros((len(paths), new_probs.shape[1]), dtype=np.float32)
+        embeddings[missing] = new_embeddings
+        probs[missing] = new_probs
+
+    missing_set = set(missing)
+    for i, path in enumerate(paths):
+        if i in missing_set:
+            continue
+        _, emb, prob = cached[path]
+        if embeddings is None:
+            embeddings = np.zeros((len(paths), emb.shape[0]), dtype=np.float32)
+            probs = np.zeros((len(paths), prob.shape[0]), dtype=np.float32)
+        embeddings[i] = emb
+        probs[i] = prob
+
+    np.savez(
+        index_path,
+        paths=np.array(paths),
+        mtimes=mtimes,
+        embeddings=embeddings,
+        probs=probs,
+        model_path=np.array(model_path),
+        model_mtime=np.array(model_mtime)
+    )
+    print(f"Index saved to {index_path}")
+
+    return {
+        'paths': paths,
+        'sources': [source for _, source in images],
+        'embeddings': embeddings,
+        'probs': probs
+    }
+
+def cluster_near_duplicates(embeddings, threshold):
+    """
+    Greedy leader clustering: each unassigned image in order claims all
+    unassigned images within `threshold` cosine distance.
+
+    Returns:
+        list: clusters as lists of indices, leader first
+    """
+    from sklearn.neighbors import NearestNeighbors
+
+    nn = NearestNeighbors(radius=threshold, metric='cosine', algorithm='brute')
+    nn.fit(embeddings)
+    neighbours = nn.radius_neighbors(embeddings, return_distance=False)
+
+    assigned = np.zeros(len(embeddings), dtype=bool)
+    clusters = []
+    for i in range(len(embeddings)):
+        if assigned[i]:
+            continue
+        members = [i] + [int(j) for j in np.sort(neighbours[i]) if j != i and not assigned[j]]
+        assigned[members] = True
+        clusters.append(members)
+    return clusters
+
+def drop_file(path, apply):
+    """
+    Move a duplicate into duplicates/ so a run can be reverted: dataset images
+    keep their class directory, live errors go to duplicates/live_errors/
+    """
+    if not apply:
+        return
+    if os.path.commonpath([path, dataset_dir]) == dataset_dir:
+        target = os.path.join(duplicates_dir, os.path.relpath(path, dataset_dir))
+    else:
+        target = os.path.join(duplicates_dir, "live_errors", os.path.basename(path))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(path, target)
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate samples and build the labeling queue")
+    parser.add_argument('--model', default=os.path.join(base_dir, "isl_cnn_model.keras"), help="Model used for embeddings")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="On-disk embedding index")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH, help="Labeling queue output")
+    parser.add_argument('--threshold', type=float, default=0.05, help="Cosine distance below which images are near-duplicates")
+    parser.add_argument('--dedup-dataset', action='store_true', help="Also drop near-duplicates inside the dataset tree")
+    parser.add_argument('--apply', action='store_true', help="Actually drop files (default is a dry run)")
+    args = parser.parse_args()
+
+    index = update_index(args.index, args.model)
+    if not index['paths']:
+        print("No images found.")
+        return
+
+    paths = index['paths']
+    sources = index['sources']
+    probs = index['probs']
+    clusters = cluster_near_duplicates(index['embeddings'], args.threshold)
+
+    dropped_live = 0
+    dropped_dataset = 0
+    queue = []
+    for members in clusters:
+        dataset_members = [i for i in members if sources[i] == 'dataset']
+        live_members = [i for i in members if sources[i] == 'live']
+
+        if dataset_members:
+            # Live errors already represented in the dataset add no information
+            for i in live_members:
+                drop_file(paths[i], args.apply)
+            dropped_live += len(live_members)
+            if args.dedup_dataset:
+                # Only same-class images duplicate the leader: near-identical crops
+                # from different classes (e.g. M/N, V/2) are the useful hard cases
+                leader_class = os.path.dirname(paths[dataset_members[0]])
+                for i in dataset_members[1:]:
+                    if os.path.dirname(paths[i]) == leader_class:
+                        drop_file(paths[i], args.apply)
+                        dropped_dataset += 1
+            continue
+
+        # Uncertainty: 1 - top class probability, worst member of the cluster
+        uncertainty = [1.0 - float(np.max(probs[i])) for i in live_members]
+        representative = live_members[0]
+        queue.append({
+            'representative': os.path.basename(paths[representative]),
+            'members': [os.path.basename(paths[i]) for i in live_members],
+            'predicted': CLASS_NAMES[int(np.argmax(probs[representative]))],
+            'uncertainty': max(uncertainty)
+        })
+
+    queue.sort(key=lambda cluster: cluster['uncertainty'], reverse=True)
+    queued_files = sum(len(cluster['members']) for cluster in queue)
+
+    action = "Dropped" if args.apply else "Would drop"
+    print(f"\n{len(clusters)} clusters over {len(paths)} images")
+    print(f"{action} {dropped_live} live errors duplicating dataset images (moved to {os.path.join(duplicates_dir, 'live_errors')})")
+    if args.dedup_dataset:
+        print(f"{action} {dropped_dataset} near-duplicate dataset images (moved to {duplicates_dir})")
+    print(f"{queued_files} live errors in {len(queue)} clusters queued for labeling")
+
+    with open(args.queue, "w") as f:
+        json.dump(queue, f, indent=2)
+    print(f"Labeling queue saved to {args.queue}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Hand detection and cropping shared by the prediction API and offline tools.
+
+Kept free of TensorFlow so it can be imported cheaply, e.g. by the
+MediaPipe worker processes in bulk_predict.py.
+"""
+
+import cv2
+
+# Class names (same order as training)
+CLASS_NAMES = [
+    '1', '2', '3', '4', '5', '6', '7', '8', '9',
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K',
+    'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U',
+    'V', 'W', 'X', 'Y', 'Z'
+]
+
+def crop_hand(frame, hands, input_size=(64, 64), padding=40, min_hand_size=32):
+    """
+    Detect hands in a BGR frame and crop the padded region around all landmarks
+
+    Args:
+        frame: BGR image
+        hands: MediaPipe Hands detector (or a stub with the same process() method)
+        input_size: Size the crop is resized to for the model
+
+    Returns:
+        dict: hand_detected, message, hand_bbox ([x1, y1, x2, y2] or None) and
+              crop (resized RGB uint8 image, or None when there is nothing to predict)
+    """
+    h, w, _ = frame.shape
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = hands.process(frame_rgb)
+
+    if not results.multi_hand_landmarks:
+        return {'hand_detected': False, 'message': 'No hand detected', 'hand_bbox': None, 'crop': None}
+
+    # Extract hand region
+    x_coords = []
+    y_coords = []
+    for hand_landmarks in results.multi_hand_landmarks:
+        for lm in hand_landmarks.landmark:
+            x_coords.append(int(lm.x * w))
+            y_coords.append(int(lm.y * h))
+
+    x_min, x_max = min(x_coords), max(x_coords)
+    y_min, y_max = min(y_coords), max(y_coords)
+
+    x1 = max(0, x_min - padding)
+    y1 = max(0, y_min - padding)
+    x2 = min(w, x_max + padding)
+    y2 = min(h, y_max + padding)
+    hand_img = frame[y1:y2, x1:x2]
+
+    if hand_img.shape[0] < min_hand_size or hand_img.shape[1] < min_hand_size:
+        return {'hand_detected': True, 'message': 'Hand too small', 'hand_bbox': None, 'crop': None}
+
+    hand_img_resized = cv2.resize(hand_img, input_size)
+    hand_img_rgb = cv2.cvtColor(hand_img_resized, cv2.COLOR_BGR2RGB)
+    return {'hand_detected': True, 'message': 'Prediction successful', 'hand_bbox': [x1, y1, x2, y2], 'crop': hand_img_rgb}
@@ -4,18 +4,29 @@ const ISL_API_URL = process.env.ISL_API_URL || 'http://localhost:5001';
 /**
  * Send image to ISL API for gesture prediction
  * @param {string} imageData - Base64 encoded image data
+ * @param {string} [clientId] - Client identifier used for latest-frame-wins queueing
  * @returns {Promise<Object>} Prediction result
  */
-async function predictGesture(imageData) {
+async function predictGesture(imageData, clientId) {
     try {
+        const headers = {
+            'Content-Type': 'application/json',
+        };
+        if (clientId) {
+            headers['X-Client-Id'] = String(clientId);
+        }
+
         const response = await fetch(`${ISL_API_URL}/api/predict`, {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
+            headers,
             body: JSON.stringify({ image: imageData })
         });
 
+        // Frame was shed (superseded, expired or queue full): pass it through
+        if (response.status === 429) {
+            return await response.json();
+        }
+
         if (!response.ok) {
             throw new Error(`ISL API error: ${response.status}`);
         }
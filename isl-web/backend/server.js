@@ -147,7 +147,12 @@ app.post('/api/predict', authenticateToken, async (req, res) => {
             return res.status(400).json({ error: 'Image data required' })
         }
 
-        const result = await predictGesture(image)
+        const result = await predictGesture(image, req.user.userId)
+
+        // Stale frames are dropped by the ISL API; don't store or process them
+        if (result.stale) {
+            return res.status(429).json(result)
+        }
         
         // Only store high-confidence predictions (>70%)
         if (result.hand_detected && result.gesture && result.confidence > 0.7) {
@@ -261,6 +261,12 @@ export default function CameraChatApp() {
       
       console.log('Prediction result:', result);
       
+      // Frame was shed by the ISL API under load: it says nothing about the hand,
+      // so leave the word and no-hand timer untouched
+      if (response.status === 429 || result.stale) {
+        return;
+      }
+      
       if (result.hand_detected && result.gesture) {
         setCurrentGesture(result.gesture);
         setPredictionConfidence(result.confidence);
@@ -5,10 +5,13 @@ import numpy as np
 import base64
 import io
 from PIL import Image
-import mediapipe as mp
-from tensorflow.keras.applications.resnet50 import preprocess_input
-from tensorflow.keras.models import load_model
 import os
+import argparse
+import math
+import threading
+import time
+from collections import OrderedDict
+from hand_crop import crop_hand, CLASS_NAMES
 
 app = Flask(__name__)
 CORS(app)
@@ -18,21 +21,146 @@ model = None
 class_names = None
 mp_hands = None
 hands = None
+preprocess_input = None
+stub_mode = False
+
+# Admission control settings (override with environment variables)
+MAX_IN_FLIGHT = int(os.environ.get('ISL_MAX_IN_FLIGHT', 1))
+MAX_QUEUE = int(os.environ.get('ISL_MAX_QUEUE', 16))
+REQUEST_DEADLINE = float(os.environ.get('ISL_REQUEST_DEADLINE', 2.0))  # seconds
+RETRY_AFTER = float(os.environ.get('ISL_RETRY_AFTER', 0.5))  # seconds
+
+class AdmissionController:
+    """
+    Bounded admission queue for prediction requests.
+
+    At most `max_in_flight` requests run inference at once and at most
+    `max_queue` wait for a slot. Each client holds at most one queued frame:
+    a newer frame from the same client takes the older one's place, and the
+    older request is shed as stale. Queued requests whose deadline passes
+    before they are admitted are shed as well.
+    """
+
+    def __init__(self, max_in_flight=1, max_queue=16):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiting = OrderedDict()  # client_id -> ticket, in arrival order
+        self.cond = threading.Condition()
+        self.stats = {
+            'admitted': 0,
+            'completed': 0,
+            'shed_replaced': 0,
+            'shed_expired': 0,
+            'shed_queue_full': 0,
+            'shed_stale': 0,
+            'max_queue_depth': 0
+        }
+
+    def acquire(self, client_id, deadline):
+        """
+        Wait for an inference slot.
+
+        Returns:
+            str: 'admitted', or the reason the request was shed
+                 ('replaced', 'expired' or 'queue_full')
+        """
+        ticket = {'deadline': deadline, 'status': 'waiting'}
+        with self.cond:
+            old = self.waiting.get(client_id)
+            if old is not None:
+                # Latest frame wins: keep the queue position, drop the old frame
+                old['status'] = 'replaced'
+                self.stats['shed_replaced'] += 1
+            elif len(self.waiting) >= self.max_queue:
+                self.stats['shed_queue_full'] += 1
+                return 'queue_full'
+            self.waiting[client_id] = ticket
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], len(self.waiting))
+            self.cond.notify_all()
+
+            while True:
+                if ticket['status'] == 'replaced':
+                    return 'replaced'
+
+                remaining = ticket['deadline'] - time.monotonic()
+                if remaining <= 0:
+                    del self.waiting[client_id]
+                    self.stats['shed_expired'] += 1
+                    self.cond.notify_all()
+                    return 'expired'
+
+                if self.in_flight < self.max_in_flight and next(iter(self.waiting)) == client_id:
+                    del self.waiting[client_id]
+                    self.in_flight += 1
+                    self.stats['admitted'] += 1
+                    self.cond.notify_all()
+                    return 'admitted'
+
+                self.cond.wait(timeout=remaining)
+
+    def release(self, stale=False):
+        """
+        Free the slot taken by an admitted request
+
+        Args:
+            stale: The request passed its deadline after admission and was shed
+        """
+        with self.cond:
+            self.in_flight -= 1
+            if stale:
+                self.stats['shed_stale'] += 1
+            else:
+                self.stats['completed'] += 1
+            self.cond.notify_all()
+
+    def snapshot(self):
+        """Return current queue depth and shed counters"""
+        with self.cond:
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self.waiting)
+            stats['in_flight'] = self.in_flight
+            stats['max_in_flight'] = self.max_in_flight
+            stats['max_queue'] = self.max_queue
+            return stats
+
+admission = AdmissionController(max_in_flight=MAX_IN_FLIGHT, max_queue=MAX_QUEUE)
+
+def shed_response(reason):
+    """Build the fast 429 response returned for shed or stale frames"""
+    messages = {
+        'replaced': 'Frame superseded by a newer frame',
+        'expired': 'Frame deadline exceeded',
+        'queue_full': 'Prediction queue full',
+        'stale': 'Frame deadline exceeded'
+    }
+    # hand_detected is unknown: the frame was dropped before or during detection
+    response = jsonify({
+        'gesture': None,
+        'confidence': 0.0,
+        'hand_detected': None,
+        'stale': True,
+        'reason': reason,
+        'message': messages.get(reason, 'Request shed'),
+        'retry_after_ms': int(RETRY_AFTER * 1000)
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(RETRY_AFTER)))
+    return response
 
 def initialize_model():
     """Initialize the model and MediaPipe hands detector"""
-    global model, class_names, mp_hands, hands
+    global model, class_names, mp_hands, hands, preprocess_input
+    
+    # Imported here so stub mode runs without TensorFlow or MediaPipe
+    import mediapipe as mp
+    from tensorflow.keras.applications.resnet50 import preprocess_input as resnet_preprocess_input
+    from tensorflow.keras.models import load_model
     
     # Load model
     model = load_model("./isl_cnn_model.keras/")
-    
-    # Define class names (same order as training)
-    class_names = [
-        '1', '2', '3', '4', '5', '6', '7', '8', '9',
-        'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K',
-        'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U',
-        'V', 'W', 'X', 'Y', 'Z'
-    ]
+    preprocess_input = resnet_preprocess_input
+    class_names = CLASS_NAMES
     
     # Initialize MediaPipe
     mp_hands = mp.solutions.hands
@@ -42,13 +170,32 @@ def initialize_model():
         min_detection_confidence=0.5
     )
 
-def process_image_for_prediction(image_data, input_size=(64, 64)):
+def initialize_stubs(model_latency=0.0, detect_latency=0.0):
+    """
+    Replace the model and MediaPipe with deterministic stubs (see serving_stubs.py)
+    
+    Args:
+        model_latency: Seconds each model.predict call sleeps
+        detect_latency: Seconds each hand detection call sleeps
+    """
+    global model, class_names, hands, preprocess_input, stub_mode
+    from serving_stubs import StubModel, StubHands, stub_preprocess_input
+    
+    class_names = CLASS_NAMES
+    model = StubModel(len(class_names), latency=model_latency)
+    hands = StubHands(latency=detect_latency)
+    preprocess_input = stub_preprocess_input
+    stub_mode = True
+
+def process_image_for_prediction(image_data, input_size=(64, 64), deadline=None):
     """
     Process image data and return prediction results
     
     Args:
         image_data: Base64 encoded image
         input_size: Target size for model input
+        deadline: Optional time.monotonic() value; if it has passed once the
+            hand crop is ready, the model is skipped and a stale result returned
     
     Returns:
         dict: Prediction results with gesture, confidence, and hand detection info
@@ -63,51 +210,29 @@ def process_image_for_prediction(image_data, input_size=(64, 64)):
         image = Image.open(io.BytesIO(image_bytes))
         frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
         
-        h, w, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(frame_rgb)
-        
-        if not results.multi_hand_landmarks:
+        hand = crop_hand(frame, hands, input_size)
+        if hand['crop'] is None:
             return {
                 'gesture': None,
                 'confidence': 0.0,
-                'hand_detected': False,
-                'message': 'No hand detected'
+                'hand_detected': hand['hand_detected'],
+                'message': hand['message']
             }
         
-        # Extract hand region
-        x_coords = []
-        y_coords = []
-        for hand_landmarks in results.multi_hand_landmarks:
-            for lm in hand_landmarks.landmark:
-                x_coords.append(int(lm.x * w))
-                y_coords.append(int(lm.y * h))
-        
-        x_min, x_max = min(x_coords), max(x_coords)
-        y_min, y_max = min(y_coords), max(y_coords)
-        
-        padding = 40
-        x1 = max(0, x_min - padding)
-        y1 = max(0, y_min - padding)
-        x2 = min(w, x_max + padding)
-        y2 = min(h, y_max + padding)
-        hand_img = frame[y1:y2, x1:x2]
-        
-        min_hand_size = 32
-        if hand_img.shape[0] < min_hand_size or hand_img.shape[1] < min_hand_size:
+        # Preprocess for model
+        img_array = np.expand_dims(hand['crop'], axis=0)
+        img_array = preprocess_input(img_array)
+        
+        # Drop expired work before running the model
+        if deadline is not None and time.monotonic() > deadline:
             return {
                 'gesture': None,
                 'confidence': 0.0,
                 'hand_detected': True,
-                'message': 'Hand too small'
+                'stale': True,
+                'message': 'Frame deadline exceeded'
             }
         
-        # Preprocess for model
-        hand_img_resized = cv2.resize(hand_img, input_size)
-        hand_img_rgb = cv2.cvtColor(hand_img_resized, cv2.COLOR_BGR2RGB)
-        img_array = np.expand_dims(hand_img_rgb, axis=0)
-        img_array = preprocess_input(img_array)
-        
         # Make prediction
         preds = model.predict(img_array, verbose=0)
         pred_idx = np.argmax(preds)
@@ -119,7 +244,7 @@ def process_image_for_prediction(image_data, input_size=(64, 64)):
             'confidence': confidence,
             'hand_detected': True,
             'message': 'Prediction successful',
-            'hand_bbox': [x1, y1, x2, y2]
+            'hand_bbox': hand['hand_bbox']
         }
         
     except Exception as e:
@@ -140,7 +265,39 @@ def predict():
             return jsonify({'error': 'No image data provided'}), 400
         
         image_data = data['image']
-        result = process_image_for_prediction(image_data)
+        
+        # Identify the client so a newer frame can replace its queued one
+        client_id = (data.get('client_id')
+                     or request.headers.get('X-Client-Id')
+                     or request.remote_addr)
+        if not isinstance(client_id, (str, int)):
+            return jsonify({'error': 'client_id must be a string'}), 400
+        client_id = str(client_id)
+        
+        budget = data.get('deadline_ms')
+        if budget is None:
+            budget = REQUEST_DEADLINE
+        else:
+            try:
+                budget = float(budget) / 1000.0
+            except (TypeError, ValueError):
+                return jsonify({'error': 'deadline_ms must be a number'}), 400
+            if not math.isfinite(budget):
+                return jsonify({'error': 'deadline_ms must be a number'}), 400
+        deadline = time.monotonic() + budget
+        
+        status = admission.acquire(client_id, deadline)
+        if status != 'admitted':
+            return shed_response(status)
+        
+        result = None
+        try:
+            result = process_image_for_prediction(image_data, deadline=deadline)
+        finally:
+            admission.release(stale=bool(result and result.get('stale')))
+        
+        if result.get('stale'):
+            return shed_response('stale')
         
         return jsonify(result)
         
@@ -153,12 +310,32 @@ def health():
     return jsonify({
         'status': 'healthy', 
         'model_loaded': model is not None,
-        'service': 'isl-prediction-api'
+        'stub': stub_mode,
+        'service': 'isl-prediction-api',
+        'admission': admission.snapshot()
     })
 
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Admission control statistics (queue depth and shed counts)"""
+    return jsonify(admission.snapshot())
+
 if __name__ == '__main__':
-    print("Initializing ISL model...")
-    initialize_model()
-    print("Model loaded successfully!")
-    print("Starting Flask API server on port 5001...")
-    app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="ISL prediction API")
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--stub', action='store_true',
+                        help="Use deterministic model/MediaPipe stubs instead of the trained model")
+    parser.add_argument('--stub-model-latency', type=float, default=0.0, help="Stub model latency in ms")
+    parser.add_argument('--stub-detect-latency', type=float, default=0.0, help="Stub hand detection latency in ms")
+    args = parser.parse_args()
+
+    if args.stub:
+        print("Initializing stub model and hand detector...")
+        initialize_stubs(args.stub_model_latency / 1000.0, args.stub_detect_latency / 1000.0)
+    else:
+        print("Initializing ISL model...")
+        initialize_model()
+        print("Model loaded successfully!")
+    print(f"Starting Flask API server on port {args.port}...")
+    # The debug reloader and debugger would distort load-test measurements
+    app.run(debug=not args.stub, host='0.0.0.0', port=args.port, threaded=True) 
\ No newline at end of file
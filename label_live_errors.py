@@ -1,17 +1,41 @@
 import os
 import cv2
+import json
 import shutil
 
 # Path to your live_errors and main dataset
 live_errors_dir = os.path.join(os.path.dirname(__file__), "live_errors")
 dataset_dir = os.path.join(os.path.dirname(__file__), "data", "indian-sign-language-dataset", "Indian")
+duplicates_dir = os.path.join(os.path.dirname(__file__), "duplicates")
+queue_path = os.path.join(live_errors_dir, "label_queue.json")
 
 files = sorted([f for f in os.listdir(live_errors_dir) if f.endswith(".png")])
 
-for filename in files:
+# Group near-duplicates using the queue from dedup_samples.py (most uncertain first);
+# without a queue every image is its own group
+if os.path.exists(queue_path):
+    with open(queue_path) as f:
+        queue = json.load(f)
+    present = set(files)
+    groups = []
+    for cluster in queue:
+        members = [m for m in cluster['members'] if m in present]
+        if members:
+            rep = cluster['representative'] if cluster['representative'] in present else members[0]
+            groups.append((rep, members, cluster.get('predicted')))
+    queued = {m for _, members, _ in groups for m in members}
+    groups += [(f, [f], None) for f in files if f not in queued]
+    print(f"Labeling {len(groups)} clusters covering {len(files)} images from {queue_path}")
+else:
+    groups = [(f, [f], None) for f in files]
+
+for filename, members, predicted in groups:
     img_path = os.path.join(live_errors_dir, filename)
     img = cv2.imread(img_path)
     display_img = cv2.resize(img, (256, 256), interpolation=cv2.INTER_NEAREST)  # Resize for better visibility
+    if len(members) > 1 or predicted:
+        info = f"x{len(members)}" + (f" pred {predicted}" if predicted else "")
+        cv2.putText(display_img, info, (5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
     cv2.imshow("Label Image (press A-Z, 1-9, - to delete, * to quit)", display_img)
     key = cv2.waitKey(0)
     key_char = chr(key).upper() if 0 <= key <= 255 else ''
@@ -20,16 +44,25 @@ for filename in files:
         class_name = key_char
         class_dir = os.path.join(dataset_dir, class_name)
         os.makedirs(class_dir, exist_ok=True)
+        # The representative joins the dataset; the rest of its cluster are near-duplicates,
+        # kept under duplicates/<class>/ so they can be restored
         shutil.move(img_path, os.path.join(class_dir, filename))
-        print(f"Moved {filename} to {class_name}")
+        if len(members) > 1:
+            class_duplicates_dir = os.path.join(duplicates_dir, class_name)
+            os.makedirs(class_duplicates_dir, exist_ok=True)
+            for member in members:
+                if member != filename:
+                    shutil.move(os.path.join(live_errors_dir, member), os.path.join(class_duplicates_dir, member))
+        print(f"Moved {filename} to {class_name}" + (f" ({len(members) - 1} duplicates moved to {class_duplicates_dir})" if len(members) > 1 else ""))
     elif key == ord('*'):
         break
     elif key == ord('-') or key == 3014656:
-        os.remove(img_path)
-        print(f"Deleted {filename}")
+        for member in members:
+            os.remove(os.path.join(live_errors_dir, member))
+        print(f"Deleted {filename}" + (f" and {len(members) - 1} duplicates" if len(members) > 1 else ""))
     else:
         print("Invalid key, skipping...")
 
     cv2.destroyAllWindows()
 
-print("Labeling complete.")
\ No newline at end of file
+print("Labeling complete.")
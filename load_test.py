@@ -0,0 +1,298 @@
+"""
+Load-testing harness for the /api/predict service.
+
+Replays recorded frames (an image directory or a video file) or synthetic
+frames against the Flask API from many virtual clients and reports
+throughput and latency percentiles per time window.
+
+Modes:
+    closed  Each of --concurrency clients sends its next frame as soon as the
+            previous response arrives (plus optional --think-ms).
+    open    Frames are sent at a fixed total --rate (requests/s) regardless of
+            how fast responses come back. Latency is measured from the
+            scheduled send time, so queueing delay is not hidden.
+
+With --stub-server the harness starts `isl_api.py --stub` itself, so serving
+overhead can be measured without the trained model or MediaPipe.
+
+Examples:
+    python load_test.py --stub-server --stub-model-latency 20 --mode closed --concurrency 8
+    python load_test.py --url http://localhost:5001 --frames recording.mp4 --mode open --rate 30
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+def encode_frame(frame, quality=92):
+    """Encode a BGR frame as a JPEG data URL, like canvas.toDataURL in the frontend (default quality 0.92)"""
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("could not encode frame")
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.tobytes()).decode('ascii')
+
+def load_frames(source, limit, quality=92):
+    """Load up to `limit` frames from an image directory or a video file"""
+    frames = []
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(source, filename))
+                if frame is not None:
+                    frames.append(encode_frame(frame, quality))
+            if len(frames) >= limit:
+                break
+    else:
+        cap = cv2.VideoCapture(source)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(encode_frame(frame, quality))
+        cap.release()
+    return frames
+
+def synthetic_frames(count, width, height, seed=0, quality=92):
+    """
+    Deterministic camera-like frames: a smooth gradient background, a skin-toned
+    blob standing in for a hand, and low-amplitude sensor noise. Uniform noise
+    would barely compress and inflate payload sizes far beyond a webcam frame.
+    """
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    background = np.stack([
+        60 + 80 * xs / width,
+        70 + 60 * ys / height,
+        90 + 50 * (xs + ys) / (width + height)
+    ], axis=-1)
+
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        cx = width // 4 + (i * 17) % max(1, width // 2)
+        cy = height // 4 + (i * 11) % max(1, height // 2)
+        cv2.ellipse(frame, (cx, cy), (width // 10, height // 7), (i * 7) % 180, 0, 360, (150, 170, 210), -1)
+        cv2.rectangle(frame, (width // 20, height // 20), (width // 5, height // 6), (40, 40, 40), -1)
+        frame = cv2.GaussianBlur(frame, (9, 9), 0)
+        frame += rng.normal(0, 2.0, size=frame.shape).astype(np.float32)
+        frames.append(encode_frame(np.clip(frame, 0, 255).astype(np.uint8), quality))
+    return frames
+
+class LoadGenerator:
+    """Sends frames to the API and records (sent, finished, latency, status) samples"""
+
+    def __init__(self, url, frames, timeout=10.0):
+        self.url = url.rstrip('/') + '/api/predict'
+        self.frames = frames
+        self.timeout = timeout
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def send(self, client_id, frame_idx, scheduled=None):
+        body = json.dumps({
+            'image': self.frames[frame_idx % len(self.frames)],
+            'client_id': f'load-{client_id}'
+        }).encode('utf-8')
+        req = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        if scheduled is None:
+            scheduled = start
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = 'error'
+        end = time.perf_counter()
+        with self.lock:
+            self.samples.append((scheduled, end, end - scheduled, status))
+
+    def run_closed(self, concurrency, duration, think_time=0.0):
+        deadline = time.perf_counter() + duration
+
+        def client(client_id):
+            # Stagger clients through the frame sequence
+            frame_idx = client_id * 7
+            while time.perf_counter() < deadline:
+                self.send(client_id, frame_idx)
+                frame_idx += 1
+                if think_time:
+                    time.sleep(think_time)
+
+        threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open(self, rate, duration, clients, max_outstanding, poisson=False):
+        start = time.perf_counter()
+        next_send = start
+        i = 0
+        with ThreadPoolExecutor(max_workers=max_outstanding) as executor:
+            while next_send < start + duration:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.send, i % clients, i // clients, next_send)
+                i += 1
+                next_send += random.expovariate(rate) if poisson else 1.0 / rate
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else float('nan')
+
+def summarize(samples, interval):
+    """Per-interval and overall throughput, latency percentiles and status counts"""
+    if not samples:
+        return [], {}
+    samples = sorted(samples, key=lambda s: s[1])
+    t0 = min(s[0] for s in samples)
+
+    windows = {}
+    for scheduled, end, latency, status in samples:
+        windows.setdefault(int((end - t0) // interval), []).append((latency, status))
+
+    rows = []
+    for window in sorted(windows):
+        entries = windows[window]
+        ok = [latency * 1000 for latency, status in entries if status == 200]
+        rows.append({
+            't': window * interval,
+            'throughput': len(entries) / interval,
+            'ok': len(ok),
+            'shed': sum(1 for _, status in entries if status == 429),
+            'errors': sum(1 for _, status in entries if status not in (200, 429)),
+            'p50_ms': percentile(ok, 50),
+            'p90_ms': percentile(ok, 90),
+            'p99_ms': percentile(ok, 99)
+        })
+
+    ok = [s[2] * 1000 for s in samples if s[3] == 200]
+    elapsed = samples[-1][1] - t0
+    overall = {
+        'requests': len(samples),
+        'elapsed_s': elapsed,
+        'throughput': len(samples) / elapsed if elapsed > 0 else float('nan'),
+        'ok_throughput': len(ok) / elapsed if elapsed > 0 else float('nan'),
+        'ok': len(ok),
+        'shed': sum(1 for s in samples if s[3] == 429),
+        'errors': sum(1 for s in samples if s[3] not in (200, 429)),
+        'p50_ms': percentile(ok, 50),
+        'p90_ms': percentile(ok, 90),
+        'p99_ms': percentile(ok, 99),
+        'max_ms': max(ok) if ok else float('nan')
+    }
+    return rows, overall
+
+def print_report(rows, overall):
+    print(f"\n{'t(s)':>6}{'req/s':>9}{'ok':>7}{'429':>7}{'err':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for row in rows:
+        print(f"{row['t']:>6.0f}{row['throughput']:>9.1f}{row['ok']:>7}{row['shed']:>7}{row['errors']:>7}"
+              f"{row['p50_ms']:>10.1f}{row['p90_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    print(f"\nTotal: {overall['requests']} requests in {overall['elapsed_s']:.1f}s "
+          f"({overall['throughput']:.1f} req/s, {overall['ok_throughput']:.1f} ok/s)")
+    print(f"OK: {overall['ok']}  Shed (429): {overall['shed']}  Errors: {overall['errors']}")
+    print(f"Latency (ok): p50 {overall['p50_ms']:.1f} ms  p90 {overall['p90_ms']:.1f} ms  "
+          f"p99 {overall['p99_ms']:.1f} ms  max {overall['max_ms']:.1f} ms")
+
+def wait_for_health(url, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url.rstrip('/') + '/api/health', timeout=1.0) as response:
+                if response.status == 200:
+                    return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the ISL prediction API")
+    parser.add_argument('--url', default='http://localhost:5001', help="Base URL of the ISL API")
+    parser.add_argument('--mode', choices=['closed', 'open'], default='closed')
+    parser.add_argument('--concurrency', type=int, default=4, help="Clients (closed loop) / distinct client ids (open loop)")
+    parser.add_argument('--rate', type=float, default=10.0, help="Total requests per second (open loop)")
+    parser.add_argument('--poisson', action='store_true', help="Poisson arrivals instead of fixed spacing (open loop)")
+    parser.add_argument('--max-outstanding', type=int, default=256, help="Max in-flight requests (open loop)")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Pause between requests per client (closed loop)")
+    parser.add_argument('--duration', type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument('--interval', type=float, default=1.0, help="Report window in seconds")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument('--frames', help="Image directory or video file to replay (default: synthetic frames)")
+    parser.add_argument('--num-frames', type=int, default=100, help="Frames to load or synthesize")
+    parser.add_argument('--frame-size', default='640x480', help="Synthetic frame size WxH")
+    parser.add_argument('--jpeg-quality', type=int, default=92,
+                        help="JPEG quality for encoded frames (browser toDataURL default is 92)")
+    parser.add_argument('--output', help="Write the per-interval and overall report as JSON")
+    parser.add_argument('--stub-server', action='store_true', help="Start isl_api.py --stub for the test")
+    parser.add_argument('--stub-port', type=int, default=5051)
+    parser.add_argument('--stub-model-latency', type=float, default=0.0, help="Stub model latency in ms")
+    parser.add_argument('--stub-detect-latency', type=float, default=0.0, help="Stub hand detection latency in ms")
+    args = parser.parse_args()
+
+    if args.frames:
+        frames = load_frames(args.frames, args.num_frames, args.jpeg_quality)
+    else:
+        width, height = (int(v) for v in args.frame_size.lower().split('x'))
+        frames = synthetic_frames(args.num_frames, width, height, quality=args.jpeg_quality)
+    if not frames:
+        print("No frames to send.")
+        sys.exit(1)
+    print(f"Loaded {len(frames)} frames (avg {sum(len(f) for f in frames) / len(frames) / 1024:.1f} KB base64)")
+
+    server = None
+    url = args.url
+    if args.stub_server:
+        url = f"http://127.0.0.1:{args.stub_port}"
+        server = subprocess.Popen([
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "isl_api.py"),
+            "--stub", "--port", str(args.stub_port),
+            "--stub-model-latency", str(args.stub_model_latency),
+            "--stub-detect-latency", str(args.stub_detect_latency)
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        if not wait_for_health(url):
+            print(f"ISL API at {url} is not responding")
+            sys.exit(1)
+
+        generator = LoadGenerator(url, frames, timeout=args.timeout)
+        print(f"Running {args.mode}-loop load test against {url} for {args.duration:.0f}s...")
+        if args.mode == 'closed':
+            generator.run_closed(args.concurrency, args.duration, args.think_ms / 1000.0)
+        else:
+            generator.run_open(args.rate, args.duration, args.concurrency, args.max_outstanding, args.poisson)
+
+        rows, overall = summarize(generator.samples, args.interval)
+        if not rows:
+            print("No requests completed.")
+            sys.exit(1)
+        print_report(rows, overall)
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'config': vars(args), 'intervals': rows, 'overall': overall}, f, indent=2)
+            print(f"Report saved to {args.output}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,53 @@
-from tensorflow.keras.applications import ResNet50
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
+import numpy as np
+from tensorflow.keras.applications import ResNet50, MobileNetV2, MobileNetV3Small, EfficientNetB0
+from tensorflow.keras.models import Sequential, Model
+from tensorflow.keras.layers import Conv2D, Dense, Dropout, GlobalAveragePooling2D
 from tensorflow.keras.optimizers import Adam
 
-def build_cnn_model(input_shape, num_classes):
-    base_model = ResNet50(input_shape=input_shape, include_top=False, weights='imagenet')
+# Backbone name -> (constructor, extra kwargs, (scale, offset) mapping 0-255 RGB to its input range).
+# All models take ResNet50-preprocessed input so the serving code stays unchanged;
+# other backbones get a fixed adapter layer that converts it to what they expect.
+BACKBONES = {
+    'resnet50': (ResNet50, {}, None),
+    'mobilenetv2': (MobileNetV2, {'alpha': 1.0}, (1 / 127.5, -1.0)),
+    'mobilenetv2_035': (MobileNetV2, {'alpha': 0.35}, (1 / 127.5, -1.0)),
+    'mobilenetv3small': (MobileNetV3Small, {'minimalistic': True}, (1.0, 0.0)),
+    'efficientnetb0': (EfficientNetB0, {}, (1.0, 0.0)),
+}
+
+# Per-channel (B, G, R) means subtracted by ResNet50 preprocess_input
+RESNET50_MEAN_BGR = [103.939, 116.779, 123.68]
+
+def build_input_adapter(input_shape, scale, offset):
+    """
+    Fixed 1x1 convolution that undoes ResNet50 preprocessing (BGR, mean-subtracted)
+    and maps the recovered RGB pixels to `pixels * scale + offset`
+    """
+    kernel = np.zeros((1, 1, 3, 3), dtype=np.float32)
+    bias = np.zeros(3, dtype=np.float32)
+    for rgb in range(3):
+        bgr = 2 - rgb
+        kernel[0, 0, bgr, rgb] = scale
+        bias[rgb] = RESNET50_MEAN_BGR[bgr] * scale + offset
+
+    adapter = Conv2D(3, 1, input_shape=input_shape, trainable=False, name='input_adapter')
+    adapter.build((None,) + tuple(input_shape))
+    adapter.set_weights([kernel, bias])
+    return adapter
+
+def build_cnn_model(input_shape, num_classes, backbone='resnet50'):
+    if backbone not in BACKBONES:
+        raise ValueError(f"Unknown backbone '{backbone}'. Choose from: {', '.join(BACKBONES)}")
+    constructor, kwargs, input_range = BACKBONES[backbone]
+
+    base_model = constructor(input_shape=input_shape, include_top=False, weights='imagenet', **kwargs)
     base_model.trainable = False  # Freeze base model
 
-    model = Sequential([
-        base_model,
+    layers = [base_model]
+    if input_range is not None:
+        layers.insert(0, build_input_adapter(input_shape, *input_range))
+
+    model = Sequential(layers + [
         GlobalAveragePooling2D(),
         Dense(256, activation='relu'),
         Dropout(0.5),
@@ -20,10 +59,11 @@ def build_cnn_model(input_shape, num_classes):
     return model
 
 class CNNModel:
-    def __init__(self, input_shape, num_classes):
+    def __init__(self, input_shape, num_classes, backbone='resnet50'):
         self.input_shape = input_shape
         self.num_classes = num_classes
-        self.model = build_cnn_model(input_shape, num_classes)
+        self.backbone = backbone
+        self.model = build_cnn_model(input_shape, num_classes, backbone)
 
     def train(self, train_data, validation_data, epochs, callbacks=None):
         history = self.model.fit(
@@ -48,4 +88,8 @@ class CNNModel:
         self.model = load_model(filepath)
 
     def unfreeze_base(self):
-        self.model.layers[0].trainable = True
\ No newline at end of file
+        # The backbone is the nested model (it follows the input adapter, if any)
+        for layer in self.model.layers:
+            if isinstance(layer, Model):
+                layer.trainable = True
+                break
@@ -0,0 +1,74 @@
+"""
+Headless replay of the live prediction loop.
+
+Runs utils.predict_live_gesture on a video file or a directory of frames
+without a camera or display, then prints the produced text and per-frame
+timing. With --clock recorded the loop's timing logic (2s between letters,
+1s of no hand before a space) follows the recorded frame timestamps, so the
+output text does not depend on how fast this machine processes frames.
+
+Examples:
+    python replay_predict.py recording.mp4
+    python replay_predict.py frames/ --fps 15 --clock wall --timings timings.jsonl
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from hand_crop import CLASS_NAMES
+from utils import predict_live_gesture, load_model
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a video or frame directory through the live prediction loop")
+    parser.add_argument('source', help="Video file or directory of frame images")
+    parser.add_argument('--model', default='./isl_cnn_model.keras/', help="Path to the trained model")
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame rate of a frame directory")
+    parser.add_argument('--clock', choices=['recorded', 'wall'], default='recorded',
+                        help="Drive timing logic from recorded timestamps or from time.time()")
+    parser.add_argument('--timings', help="Write per-frame timing and predictions as JSONL")
+    parser.add_argument('--expected', help="Fail if the produced text differs from this")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+
+    frame_log = []
+    start_time = time.perf_counter()
+    text = predict_live_gesture(
+        model, CLASS_NAMES,
+        input_size=(64, 64),
+        source=args.source,
+        headless=True,
+        simulated_clock=args.clock == 'recorded',
+        save_errors=False,
+        frame_log=frame_log,
+        fps=args.fps
+    )
+    elapsed = time.perf_counter() - start_time
+
+    if args.timings:
+        with open(args.timings, 'w') as f:
+            for entry in frame_log:
+                f.write(json.dumps(entry) + '\n')
+        print(f"Per-frame timings saved to {args.timings}")
+
+    print(f"\nProduced text: {text!r}")
+    if frame_log:
+        total_ms = np.array([entry['total_ms'] for entry in frame_log])
+        detect_ms = np.array([entry['detect_ms'] for entry in frame_log])
+        predicted = [entry['predict_ms'] for entry in frame_log if entry['prediction'] is not None]
+        print(f"Frames: {len(frame_log)} in {elapsed:.2f}s ({len(frame_log) / elapsed:.1f} FPS)")
+        print(f"Per-frame ms: mean {total_ms.mean():.1f}  p50 {np.percentile(total_ms, 50):.1f}  "
+              f"p95 {np.percentile(total_ms, 95):.1f}")
+        print(f"Detection ms: mean {detect_ms.mean():.1f}")
+        if predicted:
+            print(f"Prediction ms: mean {np.mean(predicted):.1f} over {len(predicted)} frames with a hand")
+
+    if args.expected is not None and text != args.expected:
+        print(f"Output differs from expected text {args.expected!r}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
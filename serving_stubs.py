@@ -0,0 +1,70 @@
+"""
+Deterministic stand-ins for the CNN model and MediaPipe hands detector.
+
+Used by `isl_api.py --stub` so serving overhead (JSON, base64, image
+decoding, threading, admission control) can be measured without TensorFlow,
+MediaPipe or the trained weights. Each stub sleeps for a configurable
+latency to mimic the real component's cost.
+"""
+
+import time
+
+import numpy as np
+
+# Per-channel (B, G, R) means subtracted by ResNet50 preprocess_input
+RESNET50_MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+def stub_preprocess_input(x):
+    """NumPy equivalent of ResNet50 preprocess_input (RGB -> BGR, mean-subtracted)"""
+    x = np.asarray(x, dtype=np.float32)[..., ::-1]
+    return x - RESNET50_MEAN_BGR
+
+class StubLandmark:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+class StubHandLandmarks:
+    def __init__(self, landmarks):
+        self.landmark = landmarks
+
+class StubResults:
+    def __init__(self, multi_hand_landmarks):
+        self.multi_hand_landmarks = multi_hand_landmarks
+
+class StubHands:
+    """
+    Mimics mp.solutions.hands.Hands.process. Every frame that is not blank gets
+    one hand with 21 landmarks spread over the central part of the frame.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        grid = np.linspace(0.3, 0.7, 21)
+        self.landmarks = [StubLandmark(float(x), float(y)) for x, y in zip(grid, grid[::-1])]
+
+    def process(self, frame_rgb):
+        if self.latency:
+            time.sleep(self.latency)
+        if not frame_rgb.any():
+            return StubResults(None)
+        return StubResults([StubHandLandmarks(self.landmarks)])
+
+class StubModel:
+    """
+    Mimics model.predict. The predicted class is derived from the input's mean,
+    so the same frame always produces the same gesture.
+    """
+
+    def __init__(self, num_classes, latency=0.0):
+        self.num_classes = num_classes
+        self.latency = latency
+
+    def predict(self, x, verbose=0, batch_size=None):
+        if self.latency:
+            time.sleep(self.latency)
+        x = np.asarray(x)
+        preds = np.full((x.shape[0], self.num_classes), 0.1 / (self.num_classes - 1), dtype=np.float32)
+        for i, sample in enumerate(x):
+            preds[i, int(abs(float(sample.mean())) * 1000) % self.num_classes] = 0.9
+        return preds
@@ -1,5 +1,5 @@
 from data.preprocess import resize_images, normalize_data, get_images_and_labels
-from models.cnn_model import CNNModel
+from models.cnn_model import CNNModel, BACKBONES
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -13,95 +13,162 @@ import tensorflow as tf
 import albumentations as A
 import cv2
 import random
+import argparse
+import json
+import shutil
+import tempfile
+import time
 from tensorflow.keras.utils import img_to_array
+from tensorflow.keras.models import load_model
+
+def augment_and_preprocess(dataset):
+    """Apply background and Keras augmentation, then preprocessing, to an unbatched dataset"""
+    # Data augmentation
+    data_augmentation = tf.keras.Sequential([
+        tf.keras.layers.RandomFlip("horizontal"),
+        tf.keras.layers.RandomRotation(0.1),
+        tf.keras.layers.RandomZoom(0.1),
+        tf.keras.layers.RandomBrightness(0.1)
+    ])
+
+    def augment(image, label):
+        image = data_augmentation(image)
+        return image, label
+
+    # Background augmentation 
+    dataset = dataset.map(tf_albumentations_augment, num_parallel_calls=tf.data.AUTOTUNE)
+    # Keras data augmentation
+    dataset = dataset.map(augment)
+    # Preprocessing
+    return dataset.map(preprocess)
+
+def load_datasets(data_dir, image_size=(64, 64), batch_size=32):
+    """
+    Load the train/validation split with augmentation and preprocessing applied
+
+    Returns:
+        tuple: (train_dataset, val_dataset, class_names, steps_per_epoch, validation_steps)
+    """
+    train_dataset = image_dataset_from_directory(
+        data_dir,
+        validation_split=0.2,
+        subset="training",
+        seed=42,
+        image_size=image_size,
+        batch_size=batch_size,
+        label_mode='int'
+    )
+    val_dataset = image_dataset_from_directory(
+        data_dir,
+        validation_split=0.2,
+        subset="validation",
+        seed=42,
+        image_size=image_size,
+        batch_size=batch_size,
+        label_mode='int'
+    )
 
-def main():
-    try:
-        # Set paths
-        data_dir = os.path.join("data", "indian-sign-language-dataset", "Indian")
+    # Add this block to count samples
+    train_count = 0
+    for _ in train_dataset.unbatch():
+        train_count += 1
 
-        # Use image_dataset_from_directory for efficient loading
-        image_size = (64, 64)
-        batch_size = 32
+    val_count = 0
+    for _ in val_dataset.unbatch():
+        val_count += 1
 
-        train_dataset = image_dataset_from_directory(
-            data_dir,
-            validation_split=0.2,
-            subset="training",
-            seed=42,
-            image_size=image_size,
-            batch_size=batch_size,
-            label_mode='int'
-        )
-        val_dataset = image_dataset_from_directory(
+    print(f"Train sample count: {train_count}")
+    print(f"Validation sample count: {val_count}")
+
+    # Now use these counts for steps_per_epoch and validation_steps
+    steps_per_epoch = int(np.ceil(train_count / batch_size))
+    validation_steps = int(np.ceil(val_count / batch_size))
+
+    # Get class names BEFORE mapping
+    class_names = train_dataset.class_names
+
+    # After creating train_dataset and val_dataset
+    train_dataset = augment_and_preprocess(train_dataset.unbatch())
+    val_dataset = val_dataset.unbatch().map(preprocess)
+
+    # Rebatch
+    train_dataset = train_dataset.batch(batch_size)
+    val_dataset = val_dataset.batch(batch_size)
+
+    return train_dataset, val_dataset, class_names, steps_per_epoch, validation_steps
+
+def split_file_paths(data_dir, image_size=(64, 64)):
+    """File paths (relative to data_dir) of the seeded train/validation split used by load_datasets"""
+    splits = []
+    for subset in ("training", "validation"):
+        dataset = image_dataset_from_directory(
             data_dir,
             validation_split=0.2,
-            subset="validation",
+            subset=subset,
             seed=42,
             image_size=image_size,
-            batch_size=batch_size,
             label_mode='int'
         )
+        splits.append(sorted(os.path.relpath(path, data_dir) for path in dataset.file_paths))
+    return splits[0], splits[1], dataset.class_names
+
+def manifest_path(model_path):
+    """Manifest of the files a saved model was trained on, e.g. isl_cnn_model_manifest.json"""
+    return os.path.splitext(model_path.rstrip("/"))[0] + "_manifest.json"
+
+def save_manifest(model_path, class_names, train_files, val_files, val_accuracy):
+    path = manifest_path(model_path)
+    with open(path, "w") as f:
+        json.dump({
+            'model': model_path,
+            'class_names': list(class_names),
+            'train': sorted(train_files),
+            'validation': sorted(val_files),
+            'val_accuracy': val_accuracy
+        }, f, indent=2)
+    print(f"Training manifest saved as {path}.")
+
+def load_file_dataset(data_dir, files, class_names, image_size=(64, 64)):
+    """Unbatched (image, label) dataset from paths relative to data_dir, labelled by class directory"""
+    class_index = {name: i for i, name in enumerate(class_names)}
+    paths = [os.path.join(data_dir, f) for f in files]
+    labels = [class_index[os.path.basename(os.path.dirname(os.path.join(data_dir, f)))] for f in files]
+
+    def load_image(path, label):
+        image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        image = tf.image.resize(image, image_size)  # float32, same as image_dataset_from_directory
+        return image, label
+
+    dataset = tf.data.Dataset.from_tensor_slices((paths, tf.constant(labels, dtype=tf.int32)))
+    return dataset.map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+
+def model_filename(backbone, suffix=""):
+    """Saved model name; the default ResNet50 backbone keeps the original names"""
+    if backbone == 'resnet50':
+        return f"isl_cnn_model{suffix}.keras"
+    return f"isl_cnn_model_{backbone}{suffix}.keras"
+
+def main(backbone='resnet50'):
+    try:
+        # Set paths
+        data_dir = os.path.join("data", "indian-sign-language-dataset", "Indian")
 
-        # Add this block to count samples
-        train_count = 0
-        for _ in train_dataset.unbatch():
-            train_count += 1
-
-        val_count = 0
-        for _ in val_dataset.unbatch():
-            val_count += 1
-
-        print(f"Train sample count: {train_count}")
-        print(f"Validation sample count: {val_count}")
-
-        # Now use these counts for steps_per_epoch and validation_steps
-        steps_per_epoch = int(np.ceil(train_count / batch_size))
-        validation_steps = int(np.ceil(val_count / batch_size))
+        # Use image_dataset_from_directory for efficient loading
+        image_size = (64, 64)
+        batch_size = 32
 
-        # Get class names BEFORE mapping
-        class_names = train_dataset.class_names
+        train_dataset, val_dataset, class_names, steps_per_epoch, validation_steps = load_datasets(
+            data_dir, image_size, batch_size
+        )
         num_classes = len(class_names)
         input_shape = (64, 64, 3)
 
-        # Map preprocess
-        #train_dataset = train_dataset.map(preprocess)
-        #val_dataset = val_dataset.map(preprocess)
-
-        # Data augmentation
-        data_augmentation = tf.keras.Sequential([
-            tf.keras.layers.RandomFlip("horizontal"),
-            tf.keras.layers.RandomRotation(0.1),
-            tf.keras.layers.RandomZoom(0.1),
-            tf.keras.layers.RandomBrightness(0.1)
-        ])
-
-        def augment(image, label):
-            image = data_augmentation(image)
-            return image, label
-
-        # After creating train_dataset and val_dataset
-        train_dataset = train_dataset.unbatch()
-        val_dataset = val_dataset.unbatch()
-
-        # Background augmentation 
-        train_dataset = train_dataset.map(tf_albumentations_augment, num_parallel_calls=tf.data.AUTOTUNE)
-        # Keras data augmentation
-        train_dataset = train_dataset.map(augment)
-        # Preprocessing
-        train_dataset = train_dataset.map(preprocess)
-        val_dataset = val_dataset.map(preprocess)
-
-        # Rebatch
-        train_dataset = train_dataset.batch(batch_size)
-        val_dataset = val_dataset.batch(batch_size)
-
         # Debug: Check shape and dtype
         for img, lbl in train_dataset.take(1):
             print(img.shape, img.dtype)
 
         # Build model
-        model = CNNModel(input_shape, num_classes)
+        model = CNNModel(input_shape, num_classes, backbone=backbone)
         model.model.summary()
 
         early_stop = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
@@ -142,13 +209,17 @@ def main():
         print(f"\nOverall Accuracy: {accuracy:.4f}")
 
         # Save model
-        model.save("isl_cnn_model.keras")
+        model.save(model_filename(backbone))
+
+        print(f"\nTraining complete. Model saved as {model_filename(backbone)}.")
 
-        print("\nTraining complete. Model saved as isl_cnn_model.keras.")
+        # Record which files this model was trained on for incremental updates
+        train_files, val_files, _ = split_file_paths(data_dir, image_size)
+        save_manifest(model_filename(backbone), class_names, train_files, val_files, float(accuracy))
 
         # Fine-tuning step
         print("\nStarting fine-tuning...")
-        model.unfreeze_base()  # Unfreeze ResNet base
+        model.unfreeze_base()  # Unfreeze backbone
 
         # Add this re-compile step with lower learning rate
         model.model.compile(
@@ -181,12 +252,268 @@ def main():
         print(f"\nFine-tuning Overall Accuracy: {accuracy:.4f}")
 
         # Save fine-tuned model
-        model.save("isl_cnn_model_finetuned.keras")
-        print("\nFine-tuned model saved as isl_cnn_model_finetuned.keras.")
+        model.save(model_filename(backbone, "_finetuned"))
+        print(f"\nFine-tuned model saved as {model_filename(backbone, '_finetuned')}.")
 
     except Exception as e:
         print("An error occurred during training or evaluation:", str(e))
 
+def make_distillation_loss(num_classes, temperature, alpha):
+    """
+    Knowledge-distillation loss. y_true holds the one-hot label followed by the
+    teacher's softened probabilities; y_pred is the student's softmax output.
+    """
+    def distillation_loss(y_true, y_pred):
+        hard = y_true[:, :num_classes]
+        soft = y_true[:, num_classes:]
+        student_soft = tf.nn.softmax(tf.math.log(y_pred + 1e-8) / temperature)
+        ce = tf.keras.losses.categorical_crossentropy(hard, y_pred)
+        kd = tf.keras.losses.kl_divergence(soft, student_soft) * temperature ** 2
+        return alpha * ce + (1 - alpha) * kd
+    return distillation_loss
+
+def make_distillation_accuracy(num_classes):
+    def distill_accuracy(y_true, y_pred):
+        labels = tf.argmax(y_true[:, :num_classes], axis=-1)
+        return tf.cast(tf.equal(labels, tf.argmax(y_pred, axis=-1)), tf.float32)
+    return distill_accuracy
+
+def evaluate_accuracy(model, dataset):
+    """Validation accuracy of a model on a (preprocessed image, int label) dataset"""
+    labels = []
+    preds = []
+    for batch_images, batch_labels in dataset:
+        preds.append(np.argmax(model.predict(batch_images, verbose=0), axis=1))
+        labels.append(batch_labels.numpy())
+    return float(np.mean(np.concatenate(labels) == np.concatenate(preds)))
+
+def model_size_on_disk(model):
+    """Size in bytes of the model saved in .keras format"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "model.keras")
+        model.save(path)
+        if os.path.isdir(path):
+            return sum(os.path.getsize(os.path.join(root, f))
+                       for root, _, files in os.walk(path) for f in files)
+        return os.path.getsize(path)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+def measure_cpu_latency(model, input_shape, batch_size=1, runs=50, warmup=5):
+    """Median model.predict latency in milliseconds on the CPU"""
+    x = np.random.uniform(-128, 128, size=(batch_size,) + tuple(input_shape)).astype(np.float32)
+    timings = []
+    with tf.device('/CPU:0'):
+        for i in range(warmup + runs):
+            start = time.perf_counter()
+            model.predict(x, verbose=0)
+            if i >= warmup:
+                timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def compare_models(models, val_dataset, input_shape, batch_size=32, report_path="model_comparison.json"):
+    """
+    Compare models on parameter count, size on disk, CPU latency and validation accuracy
+
+    Args:
+        models: dict of name -> Keras model
+        val_dataset: Preprocessed validation dataset
+        input_shape: Model input shape (H, W, C)
+        batch_size: Batch size for the batched latency measurement
+        report_path: Where to write the JSON report
+    """
+    report = {}
+    for name, model in models.items():
+        batched_ms = measure_cpu_latency(model, input_shape, batch_size=batch_size)
+        report[name] = {
+            'params': int(model.count_params()),
+            'size_mb': model_size_on_disk(model) / (1024 * 1024),
+            'single_frame_ms': measure_cpu_latency(model, input_shape, batch_size=1),
+            'batched_ms_per_frame': batched_ms / batch_size,
+            'val_accuracy': evaluate_accuracy(model, val_dataset)
+        }
+
+    print("\nModel comparison (CPU):")
+    print(f"{'model':<30}{'params':>12}{'size MB':>10}{'1-frame ms':>12}{f'b{batch_size} ms/frame':>16}{'val acc':>10}")
+    for name, row in report.items():
+        print(f"{name:<30}{row['params']:>12,}{row['size_mb']:>10.1f}{row['single_frame_ms']:>12.2f}"
+              f"{row['batched_ms_per_frame']:>16.3f}{row['val_accuracy']:>10.4f}")
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nComparison report saved as {report_path}.")
+    return report
+
+def distill(backbone, teacher_path="isl_cnn_model.keras", temperature=4.0, alpha=0.1, epochs=30, finetune_epochs=5):
+    """
+    Train a student model with the given backbone, distilling from the saved
+    ResNet50 teacher, then compare teacher and student.
+    """
+    try:
+        data_dir = os.path.join("data", "indian-sign-language-dataset", "Indian")
+        image_size = (64, 64)
+        batch_size = 32
+
+        train_dataset, val_dataset, class_names, steps_per_epoch, validation_steps = load_datasets(
+            data_dir, image_size, batch_size
+        )
+        num_classes = len(class_names)
+        input_shape = (64, 64, 3)
+
+        teacher = load_model(teacher_path)
+        teacher.trainable = False
+
+        def add_teacher_targets(images, labels):
+            # Soften the teacher's probabilities with the distillation temperature
+            teacher_probs = teacher(images, training=False)
+            soft = tf.nn.softmax(tf.math.log(teacher_probs + 1e-8) / temperature)
+            hard = tf.one_hot(labels, num_classes)
+            return images, tf.concat([hard, soft], axis=-1)
+
+        distill_train = train_dataset.map(add_teacher_targets)
+        distill_val = val_dataset.map(add_teacher_targets)
+
+        student = CNNModel(input_shape, num_classes, backbone=backbone)
+        student.model.summary()
+
+        loss = make_distillation_loss(num_classes, temperature, alpha)
+        accuracy = make_distillation_accuracy(num_classes)
+        early_stop = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
+
+        # Train the head against the teacher, then fine-tune the whole backbone
+        for phase, learning_rate, n_epochs in [("head", 1e-3, epochs), ("fine-tune", 1e-5, finetune_epochs)]:
+            if phase == "fine-tune":
+                print("\nStarting distillation fine-tuning...")
+                student.unfreeze_base()
+            student.model.compile(optimizer=Adam(learning_rate=learning_rate), loss=loss, metrics=[accuracy])
+            student.model.fit(
+                distill_train,
+                validation_data=distill_val,
+                epochs=n_epochs,
+                callbacks=[early_stop],
+                steps_per_epoch=steps_per_epoch,
+                validation_steps=validation_steps
+            )
+
+        # Recompile with the standard loss so the saved model loads without custom objects
+        student.model.compile(
+            optimizer=Adam(learning_rate=1e-5),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        student_path = model_filename(backbone, "_distilled")
+        student.save(student_path)
+        print(f"\nDistilled model saved as {student_path}.")
+
+        compare_models(
+            {f"teacher ({teacher_path})": teacher, f"student ({student_path})": student.model},
+            val_dataset,
+            input_shape,
+            batch_size=batch_size
+        )
+
+    except Exception as e:
+        print("An error occurred during distillation:", str(e))
+
+def incremental(model_path="isl_cnn_model.keras", replay_ratio=3.0, epochs=3, learning_rate=1e-4, tolerance=0.01):
+    """
+    Fine-tune a saved model on newly added samples mixed with a replay buffer of
+    samples it was already trained on, instead of retraining from scratch.
+
+    The manifest next to the model (written by a full training run) lists the
+    files already incorporated and the validation split. The model is only
+    overwritten if accuracy on the old validation split does not drop by more
+    than `tolerance`; otherwise it is saved as a candidate.
+    """
+    try:
+        start_time = time.time()
+        data_dir = os.path.join("data", "indian-sign-language-dataset", "Indian")
+        image_size = (64, 64)
+        batch_size = 32
+
+        if not os.path.exists(manifest_path(model_path)):
+            # The old validation split can't be recovered from the current directory:
+            # the seeded split shuffles the whole file list, so new files change it
+            print(f"No manifest for {model_path}, so its original train/validation split is unknown. "
+                  f"Run a full training once to write one: python train.py")
+            return
+
+        with open(manifest_path(model_path)) as f:
+            manifest = json.load(f)
+
+        # Files moved away since the last run (e.g. by dedup_samples.py --dedup-dataset)
+        def exists(f):
+            return os.path.exists(os.path.join(data_dir, f))
+
+        train_files = [f for f in manifest['train'] if exists(f)]
+        val_files = [f for f in manifest['validation'] if exists(f)]
+        if len(train_files) != len(manifest['train']) or len(val_files) != len(manifest['validation']):
+            print(f"Dropping {len(manifest['train']) - len(train_files)} train and "
+                  f"{len(manifest['validation']) - len(val_files)} validation files that no longer exist.")
+            manifest['train'] = train_files
+            manifest['validation'] = val_files
+            save_manifest(model_path, manifest['class_names'], train_files, val_files, manifest['val_accuracy'])
+        if not val_files:
+            print("None of the old validation files remain. Run a full training first: python train.py")
+            return
+
+        class_names = manifest['class_names']
+        known = set(manifest['train']) | set(manifest['validation'])
+
+        new_files = []
+        for class_name in class_names:
+            class_dir = os.path.join(data_dir, class_name)
+            if not os.path.isdir(class_dir):
+                continue
+            for filename in sorted(os.listdir(class_dir)):
+                rel_path = os.path.join(class_name, filename)
+                if rel_path not in known and filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
+                    new_files.append(rel_path)
+
+        if not new_files:
+            print("No new samples since the last training run.")
+            return
+
+        random.seed(42)
+        replay_count = min(len(manifest['train']), int(len(new_files) * replay_ratio))
+        replay_files = random.sample(manifest['train'], replay_count)
+        print(f"New samples: {len(new_files)}, replay samples: {len(replay_files)}")
+
+        train_dataset = load_file_dataset(data_dir, new_files + replay_files, class_names, image_size)
+        train_dataset = augment_and_preprocess(train_dataset.shuffle(len(new_files) + len(replay_files), seed=42))
+        train_dataset = train_dataset.batch(batch_size)
+        val_dataset = load_file_dataset(data_dir, manifest['validation'], class_names, image_size)
+        val_dataset = val_dataset.map(preprocess).batch(batch_size)
+
+        model = load_model(model_path)
+        baseline_accuracy = evaluate_accuracy(model, val_dataset)
+        print(f"Old validation accuracy before update: {baseline_accuracy:.4f}")
+
+        model.compile(
+            optimizer=Adam(learning_rate=learning_rate),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        model.fit(train_dataset, validation_data=val_dataset, epochs=epochs)
+
+        accuracy = evaluate_accuracy(model, val_dataset)
+        print(f"Old validation accuracy after update: {accuracy:.4f}")
+
+        if accuracy < baseline_accuracy - tolerance:
+            candidate_path = os.path.splitext(model_path.rstrip("/"))[0] + "_candidate.keras"
+            model.save(candidate_path)
+            print(f"\nAccuracy regressed by {baseline_accuracy - accuracy:.4f} (tolerance {tolerance}); "
+                  f"{model_path} left unchanged, update saved as {candidate_path}.")
+            return
+
+        model.save(model_path)
+        save_manifest(model_path, class_names, manifest['train'] + new_files, manifest['validation'], accuracy)
+        print(f"\nIncremental update complete in {time.time() - start_time:.0f}s. Model saved as {model_path}.")
+
+    except Exception as e:
+        print("An error occurred during incremental training:", str(e))
+
 def preprocess(image, label):
     image = preprocess_input(image)
     return image, label
@@ -220,4 +547,27 @@ def tf_albumentations_augment(image, label):
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the ISL gesture model")
+    parser.add_argument('--backbone', default='resnet50', choices=list(BACKBONES),
+                        help="Backbone for the model being trained")
+    parser.add_argument('--distill', action='store_true',
+                        help="Distill from the saved ResNet50 model instead of training from labels only")
+    parser.add_argument('--teacher', default='isl_cnn_model.keras', help="Teacher model for --distill")
+    parser.add_argument('--temperature', type=float, default=4.0, help="Distillation temperature")
+    parser.add_argument('--alpha', type=float, default=0.1, help="Weight of the hard-label loss when distilling")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Fine-tune the saved model on newly added samples plus a replay buffer")
+    parser.add_argument('--model', default='isl_cnn_model.keras', help="Model to update for --incremental")
+    parser.add_argument('--replay-ratio', type=float, default=3.0,
+                        help="Replayed old samples per new sample for --incremental")
+    parser.add_argument('--epochs', type=int, default=3, help="Epochs for --incremental")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="Allowed drop in old validation accuracy for --incremental")
+    args = parser.parse_args()
+
+    if args.incremental:
+        incremental(args.model, replay_ratio=args.replay_ratio, epochs=args.epochs, tolerance=args.tolerance)
+    elif args.distill:
+        distill(args.backbone, teacher_path=args.teacher, temperature=args.temperature, alpha=args.alpha)
+    else:
+        main(args.backbone)
\ No newline at end of file
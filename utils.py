@@ -29,27 +29,104 @@ def visualize_results(history):
     plt.legend()
     plt.show()
 
-def predict_live_gesture(model, class_names, input_size=(64, 64)):
-    spell = SpellChecker()
-    cap = cv2.VideoCapture(0)
+class SimulatedClock:
+    """Stands in for time.time() when replaying frames at their recorded timestamps"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+def camera_frames(cap):
+    """Yield (timestamp, frame) from an opened camera; timestamps are not known"""
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            print("Failed to grab frame (camera disconnected or busy)")
+            break
+        yield None, frame
+
+def replay_frames(source, fps=30.0):
+    """
+    Yield (timestamp, frame) from a video file or a directory of frame images.
+    Video timestamps are the recorded ones (webcam recordings are often variable
+    frame rate); directory frames are spaced 1/fps apart.
+    """
+    if os.path.isdir(source):
+        files = sorted(f for f in os.listdir(source) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        for i, filename in enumerate(files):
+            frame = cv2.imread(os.path.join(source, filename))
+            if frame is not None:
+                yield i / fps, frame
+        return
+
+    cap = cv2.VideoCapture(source)
     if not cap.isOpened():
-        print("Cannot open webcam")
+        print(f"Cannot open video: {source}")
         return
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    i = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Fall back to the nominal frame rate when the backend reports no timestamp
+            pos_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            yield (pos_msec / 1000.0 if pos_msec > 0 else i / video_fps), frame
+            i += 1
+    finally:
+        cap.release()
+
+def predict_live_gesture(model, class_names, input_size=(64, 64), source=0, headless=False,
+                         simulated_clock=False, save_errors=True, frame_log=None, fps=30.0):
+    """
+    Run the live prediction loop (detection, smoothing, spacing on no hand, autocorrect).
+
+    Args:
+        source: Camera index, or a video file / frame directory to replay
+        headless: Skip drawing, the preview window and key handling
+        simulated_clock: Use the replayed frames' timestamps instead of time.time(),
+            so timing-based logic is independent of processing speed
+        save_errors: Save confident hand crops to live_errors/
+        frame_log: Optional list that receives a timing/prediction dict per frame
+        fps: Frame rate assumed for frame directories
+
+    Returns:
+        str: The produced text
+    """
+    spell = SpellChecker()
+    cap = None
+    if isinstance(source, int):
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print("Cannot open webcam")
+            return ""
+        frames = camera_frames(cap)
+    else:
+        frames = replay_frames(source, fps)
+
+    # A simulated clock needs recorded timestamps, which a camera doesn't provide
+    simulated_clock = simulated_clock and cap is None
+    clock = SimulatedClock() if simulated_clock else time.time
 
     mp_hands = mp.solutions.hands
     hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
     mp_draw = mp.solutions.drawing_utils
 
-    print("Press 'q' to quit.")
+    if not headless:
+        print("Press 'q' to quit.")
     word_buffer = ""
     last_pred = ""
-    last_time = time.time()
+    last_time = clock()
     pred_buffer = deque(maxlen=7)
 
     error_dir = os.path.join(os.path.dirname(__file__), "live_errors")
-    os.makedirs(error_dir, exist_ok=True)
-    existing_errors = [f for f in os.listdir(error_dir) if f.startswith("error_") and f.endswith(".png")]
-    error_count = len(existing_errors) + 1
+    if save_errors:
+        os.makedirs(error_dir, exist_ok=True)
+        existing_errors = [f for f in os.listdir(error_dir) if f.startswith("error_") and f.endswith(".png")]
+        error_count = len(existing_errors) + 1
 
     last_hand_position = None
     stagnant_start_time = None
@@ -59,16 +136,28 @@ def predict_live_gesture(model, class_names, input_size=(64, 64)):
     def positions_close(pos1, pos2, tol=5):
         return all(abs(a - b) <= tol for a, b in zip(pos1, pos2))
 
+    frame_end = time.perf_counter()
+
+    def log_frame(timing, frame_start):
+        nonlocal frame_end
+        frame_end = time.perf_counter()
+        if frame_log is not None:
+            timing['total_ms'] = (frame_end - frame_start) * 1000
+            timing['text'] = word_buffer
+            frame_log.append(timing)
+
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Failed to grab frame (camera disconnected or busy)")
-                break
+        for frame_idx, (timestamp, frame) in enumerate(frames):
+            frame_start = time.perf_counter()
+            if simulated_clock:
+                clock.now = timestamp
+            timing = {'frame': frame_idx, 'timestamp': timestamp, 'read_ms': (frame_start - frame_end) * 1000,
+                      'detect_ms': 0.0, 'predict_ms': 0.0, 'prediction': None, 'confidence': 0.0}
 
             h, w, _ = frame.shape
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = hands.process(frame_rgb)
+            timing['detect_ms'] = (time.perf_counter() - frame_start) * 1000
 
             display_text = "Detecting..."
 
@@ -91,43 +180,49 @@ def predict_live_gesture(model, class_names, input_size=(64, 64)):
 
                 min_hand_size = 32
                 if hand_img.shape[0] < min_hand_size or hand_img.shape[1] < min_hand_size:
+                    log_frame(timing, frame_start)
                     continue
 
                 if hand_img.size != 0:
+                    predict_start = time.perf_counter()
                     hand_img_resized = cv2.resize(hand_img, input_size)
                     hand_img_rgb = cv2.cvtColor(hand_img_resized, cv2.COLOR_BGR2RGB)
                     img_array = np.expand_dims(hand_img_rgb, axis=0)
                     img_array = preprocess_input(img_array)
-                    preds = model.predict(img_array)
+                    preds = model.predict(img_array, verbose=0)
                     pred_idx = np.argmax(preds)
                     confidence = float(np.max(preds))
                     current_pred = class_names[pred_idx]
+                    timing['predict_ms'] = (time.perf_counter() - predict_start) * 1000
 
                     pred_buffer.append(current_pred)
                     if len(pred_buffer) == pred_buffer.maxlen:
                         smoothed_pred = Counter(pred_buffer).most_common(1)[0][0]
                     else:
                         smoothed_pred = current_pred
+                    timing['prediction'] = smoothed_pred
+                    timing['confidence'] = confidence
 
                     # --- Prediction logic ---
-                    if smoothed_pred and confidence > 0.5 and time.time() - last_time > 2.0:
+                    if smoothed_pred and confidence > 0.5 and clock() - last_time > 2.0:
                         word_buffer += smoothed_pred
                         last_pred = smoothed_pred
-                        last_time = time.time()
+                        last_time = clock()
 
                     display_text = f"{smoothed_pred} ({confidence:.2f})"
 
-                    if confidence > 0.5:
+                    if save_errors and confidence > 0.5:
                         error_img_path = os.path.join(error_dir, f"error_{error_count}.png")
                         cv2.imwrite(error_img_path, hand_img_resized)
                         error_count += 1
 
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+                if not headless:
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
             else:
                 # No hand detected
                 if no_hand_start_time is None:
-                    no_hand_start_time = time.time()
-                elif time.time() - no_hand_start_time > STAGNANT_THRESHOLD:
+                    no_hand_start_time = clock()
+                elif clock() - no_hand_start_time > STAGNANT_THRESHOLD:
                     if not word_buffer.endswith(" "):
                         # Autocorrect previous word before adding space
                         words = word_buffer.strip().split(" ")
@@ -144,6 +239,10 @@ def predict_live_gesture(model, class_names, input_size=(64, 64)):
                         print("Space added due to no hand motion.")
                     no_hand_start_time = None  # Reset timer after adding space
 
+            if headless:
+                log_frame(timing, frame_start)
+                continue
+
             cv2.putText(frame, f"Word: {word_buffer}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 128, 0), 2)
             cv2.putText(frame, display_text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
@@ -167,8 +266,15 @@ def predict_live_gesture(model, class_names, input_size=(64, 64)):
                 last_pred = ""
                 pred_buffer.clear()
                 print("New sentence/word started.")
+
+            log_frame(timing, frame_start)
     except Exception as e:
         print(f"Exception occurred: {e}")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
\ No newline at end of file
+        if cap is not None:
+            cap.release()
+        hands.close()
+        if not headless:
+            cv2.destroyAllWindows()
+
+    return word_buffer